@@ -4,6 +4,7 @@ function Show-Help {
     Write-Host "Available targets:"
     Write-Host "  install     Install dependencies using uv"
     Write-Host "  sync        Sync dependencies using uv"
+    Write-Host "  compile     Precompile modules to bytecode"
     Write-Host "  format      Format code with black and isort"
     Write-Host "  lint        Check code style with flake8"
     Write-Host "  test        Run tests"
@@ -14,6 +15,12 @@ function Show-Help {
 function Invoke-Install {
     Write-Host "Installing dependencies using uv..."
     uv pip install -e .
+    Invoke-Compile
+}
+
+function Invoke-Compile {
+    Write-Host "Precompiling modules to bytecode..."
+    python -m compileall -q verify_setup.py parse_document.py advanced_parsing.py start_api.py api
 }
 
 function Invoke-Sync {
@@ -105,6 +112,7 @@ switch ($target) {
     "help" { Show-Help }
     "install" { Invoke-Install }
     "sync" { Invoke-Sync }
+    "compile" { Invoke-Compile }
     "format" { Invoke-Format }
     "lint" { Invoke-Lint }
     "test" { Invoke-Test }
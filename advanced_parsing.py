@@ -1,12 +1,84 @@
 import os
 import argparse
+import math
+import multiprocessing
+import shutil
 import sys
+import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from docling.document_converter import DocumentConverter
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.datamodel.format_option import PdfFormatOption
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import orjson
+
+from api.uploads import restore_document_name
+
+def _output_paths(doc_path, output_dir, suffix=""):
+    """
+    Build the Markdown and JSON output paths for a document.
+    
+    Args:
+        doc_path (str): Path to the source document
+        output_dir (str): Directory to save results
+        suffix (str): Suffix appended to the file name before the extension
+        
+    Returns:
+        tuple: (markdown_path, json_path)
+    """
+    name_without_ext = os.path.splitext(os.path.basename(doc_path))[0]
+    md_path = os.path.join(output_dir, f"{name_without_ext}{suffix}.md")
+    json_path = os.path.join(output_dir, f"{name_without_ext}{suffix}.json")
+    return md_path, json_path
+
+def _write_markdown(markdown_content, md_path):
+    """
+    Write Markdown content to a file.
+    
+    Args:
+        markdown_content (str): Markdown to write
+        md_path (str): Destination path
+    """
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write(markdown_content)
+
+def _write_json(json_content, json_path, pretty=False):
+    """
+    Write JSON content to a file as UTF-8 encoded by orjson.
+    
+    Args:
+        json_content (dict): JSON-serializable content to write
+        json_path (str): Destination path
+        pretty (bool): Indent the output with two spaces instead of writing
+            compact JSON
+    """
+    option = orjson.OPT_APPEND_NEWLINE
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    with open(json_path, 'wb') as f:
+        f.write(orjson.dumps(json_content, option=option))
+
+# Number of parsing processes sharing the CPU; set in pool workers by _init_worker
+_NUM_WORKERS = 1
+
+# ConversionStatus values of usable conversions. ConversionStatus is a str enum,
+# so comparing values lets this module import Docling only with the converter.
+_CONVERTED_STATUSES = ("success", "partial_success")
+
+def _get_converter(do_ocr=True, do_table_structure=True):
+    """
+    Return the cached DocumentConverter for the given PDF pipeline options.
+    
+    Args:
+        do_ocr (bool): Enable OCR for PDFs
+        do_table_structure (bool): Enable table structure detection for PDFs
+        
+    Returns:
+        DocumentConverter: Shared converter instance, with the CPU threads
+            split between this process and the other pool workers
+    """
+    from api.converters import get_converter
+    
+    return get_converter(do_ocr, do_table_structure, _NUM_WORKERS)
 
 def parse_pdf_with_options(pdf_path):
     """
@@ -18,16 +90,8 @@ def parse_pdf_with_options(pdf_path):
     Returns:
         tuple: (markdown_content, json_content)
     """
-    # Configure pipeline options
-    pipeline_options = PdfPipelineOptions()
-    pipeline_options.do_ocr = False  # Disable OCR if not needed
-    pipeline_options.do_table_structure = True  # Enable table structure
-    
-    # Create format option with pipeline options
-    pdf_format_option = PdfFormatOption(pipeline_options=pipeline_options)
-    
-    # Initialize converter with specific format option
-    converter = DocumentConverter(format_options={InputFormat.PDF: pdf_format_option})
+    # Disable OCR if not needed, enable table structure
+    converter = _get_converter(do_ocr=False, do_table_structure=True)
     
     # Convert the document
     result = converter.convert(pdf_path)
@@ -38,25 +102,68 @@ def parse_pdf_with_options(pdf_path):
     
     return markdown_content, json_content
 
-def parse_single_document(doc_path):
+def _export_document(doc_path, document, output_dir=None, pretty=False):
     """
-    Parse a single document and return the result.
+    Export a converted document to Markdown and JSON.
     
     Args:
-        doc_path (str): Path to the document
+        doc_path (str): Path to the source document
+        document (DoclingDocument): Converted document
+        output_dir (str, optional): Directory to write the exports to. When
+            omitted, the exports are returned in the result instead.
+        pretty (bool): Write indented instead of compact JSON
         
     Returns:
         dict: Parsing result
     """
-    try:
-        converter = DocumentConverter()
-        result = converter.convert(doc_path)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        md_path, json_path = _output_paths(doc_path, output_dir)
+        _write_markdown(document.export_to_markdown(), md_path)
+        _write_json(document.export_to_dict(), json_path, pretty)
         return {
             'source': doc_path,
-            'markdown': result.document.export_to_markdown(),
-            'json': result.document.export_to_dict(),
+            'markdown_path': md_path,
+            'json_path': json_path,
+            'size': os.path.getsize(md_path) + os.path.getsize(json_path),
             'success': True
         }
+    
+    return {
+        'source': doc_path,
+        'markdown': document.export_to_markdown(),
+        'json': document.export_to_dict(),
+        'success': True
+    }
+
+def parse_single_document(doc_path, converter=None, output_dir=None, pretty=False,
+                          source_name=None):
+    """
+    Parse a single document and return the result.
+    
+    When output_dir is given, the Markdown and JSON exports are written to disk
+    as soon as they are produced and only their paths are returned, so the
+    exported content is freed before the next document is parsed.
+    
+    Args:
+        doc_path (str): Path to the document
+        converter (DocumentConverter, optional): Converter to use instead of
+            the cached default converter
+        output_dir (str, optional): Directory to save results to
+        pretty (bool): Write indented instead of compact JSON
+        source_name (str, optional): File name to give the converted document
+            instead of the name of doc_path, e.g. for a page slice
+        
+    Returns:
+        dict: Parsing result
+    """
+    try:
+        if converter is None:
+            converter = _get_converter()
+        result = converter.convert(doc_path)
+        if source_name:
+            restore_document_name(result.document, source_name)
+        return _export_document(doc_path, result.document, output_dir, pretty)
     except Exception as e:
         return {
             'source': doc_path,
@@ -64,20 +171,58 @@ def parse_single_document(doc_path):
             'success': False
         }
 
-def parse_multiple_documents_sequential(doc_paths):
+def _init_worker(page_batch_size=None, num_workers=1):
+    """
+    Initialize a worker process by building its cached DocumentConverter.
+    
+    Args:
+        page_batch_size (int, optional): Number of pages Docling processes
+            per internal batch inside this worker
+        num_workers (int): Number of worker processes in the pool, used to
+            split the CPU threads between them
+    """
+    global _NUM_WORKERS
+    _NUM_WORKERS = num_workers
+    if page_batch_size is not None:
+        from docling.datamodel.settings import settings
+        settings.perf.page_batch_size = page_batch_size
+    _get_converter()
+
+def _worker_parse(doc_path, output_dir=None, pretty=False, source_name=None):
+    """
+    Parse a document inside a worker process using its cached converter.
+    
+    Args:
+        doc_path (str): Path to the document
+        output_dir (str, optional): Directory to save results to
+        pretty (bool): Write indented instead of compact JSON
+        source_name (str, optional): File name to give the converted document
+        
+    Returns:
+        dict: Parsing result
+    """
+    return parse_single_document(
+        doc_path, output_dir=output_dir, pretty=pretty, source_name=source_name
+    )
+
+def parse_multiple_documents_sequential(doc_paths, output_dir=None, pretty=False):
     """
     Parse multiple documents sequentially.
     
     Args:
         doc_paths (list): List of document paths
+        output_dir (str, optional): Directory to save results to as each
+            document is parsed
+        pretty (bool): Write indented instead of compact JSON
         
     Returns:
         list: List of parsed documents
     """
     results = []
+    converter = _get_converter()
     
     for path in doc_paths:
-        result = parse_single_document(path)
+        result = parse_single_document(path, converter, output_dir, pretty)
         results.append(result)
         if result['success']:
             print(f"Successfully parsed: {path}")
@@ -86,23 +231,122 @@ def parse_multiple_documents_sequential(doc_paths):
     
     return results
 
-def parse_multiple_documents_concurrent(doc_paths, max_workers=4):
+def _batch_conversion_result(doc_path, conversion, output_dir=None, pretty=False):
+    """
+    Build the parsing result for one conversion returned by convert_all.
+    
+    Args:
+        doc_path (str): Path to the source document
+        conversion (ConversionResult): Conversion of the document
+        output_dir (str, optional): Directory to save results to
+        pretty (bool): Write indented instead of compact JSON
+        
+    Returns:
+        dict: Parsing result
+    """
+    try:
+        if conversion.status not in _CONVERTED_STATUSES:
+            errors = "; ".join(error.error_message for error in conversion.errors)
+            raise RuntimeError(errors or f"Conversion status: {conversion.status}")
+        return _export_document(doc_path, conversion.document, output_dir, pretty)
+    except Exception as e:
+        return {
+            'source': doc_path,
+            'error': str(e),
+            'success': False
+        }
+
+def parse_multiple_documents_batch(doc_paths, output_dir=None, pretty=False):
+    """
+    Parse multiple documents as one batch through a single shared converter.
+    
+    Uses DocumentConverter.convert_all, so Docling's models are loaded once
+    and the documents are streamed through the same pipeline. Inputs that are
+    not readable files, and any left over if the batch stops early, are parsed
+    one by one instead, so they are reported like in the other modes.
+    
+    Args:
+        doc_paths (list): List of document paths
+        output_dir (str, optional): Directory to save results to as each
+            document is parsed
+        pretty (bool): Write indented instead of compact JSON
+        
+    Returns:
+        list: List of parsed documents, in the order of doc_paths
+    """
+    results = [None] * len(doc_paths)
+    converter = _get_converter()
+    
+    # convert_all reads each source while iterating, so an unreadable file would
+    # end the whole batch; keep those out of it
+    sources = []
+    pending = {}
+    for index, path in enumerate(doc_paths):
+        if os.path.isfile(path) and os.access(path, os.R_OK):
+            source = Path(path)
+            sources.append(source)
+            pending.setdefault(source, []).append(index)
+    
+    # Path sources keep their path in conversion.input.file, which pairs each
+    # conversion with its input
+    try:
+        for conversion in converter.convert_all(sources, raises_on_error=False):
+            index = pending[conversion.input.file].pop(0)
+            path = doc_paths[index]
+            results[index] = _batch_conversion_result(path, conversion, output_dir, pretty)
+            if results[index]['success']:
+                print(f"Successfully parsed: {path}")
+            else:
+                print(f"Error parsing {path}: {results[index]['error']}")
+    except Exception as e:
+        print(f"Batch conversion stopped early, parsing the rest one by one: {e}")
+    
+    for index, path in enumerate(doc_paths):
+        if results[index] is not None:
+            continue
+        results[index] = parse_single_document(path, converter, output_dir, pretty)
+        if results[index]['success']:
+            print(f"Successfully parsed: {path}")
+        else:
+            print(f"Error parsing {path}: {results[index]['error']}")
+    
+    return results
+
+def parse_multiple_documents_concurrent(doc_paths, max_workers=None, output_dir=None,
+                                        pretty=False):
     """
-    Parse multiple documents concurrently using ThreadPoolExecutor.
+    Parse multiple documents concurrently using ProcessPoolExecutor.
+    
+    Docling parsing is CPU-bound and holds the GIL, so each document is
+    parsed in a separate process rather than a thread.
     
     Args:
         doc_paths (list): List of document paths
-        max_workers (int): Maximum number of concurrent threads
+        max_workers (int, optional): Maximum number of worker processes.
+            Defaults to the number of CPUs, capped by the number of documents.
+        output_dir (str, optional): Directory the workers save results to
+        pretty (bool): Write indented instead of compact JSON
         
     Returns:
         list: List of parsed documents
     """
     results = []
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    if not doc_paths:
+        return results
+    
+    if max_workers is None:
+        max_workers = min(len(doc_paths), os.cpu_count() or 1)
+    
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(None, max_workers),
+    ) as executor:
         # Submit all parsing tasks
         future_to_path = {
-            executor.submit(parse_single_document, path): path 
+            executor.submit(_worker_parse, path, output_dir, pretty): path 
             for path in doc_paths
         }
         
@@ -127,34 +371,335 @@ def parse_multiple_documents_concurrent(doc_paths, max_workers=4):
     
     return results
 
-def save_results(results, output_dir="output"):
+def _count_pdf_pages(doc_path):
+    """
+    Count the pages of a PDF without parsing it.
+    
+    Args:
+        doc_path (str): Path to the document
+        
+    Returns:
+        int: Number of pages, or 0 if the document is not a readable PDF
+    """
+    if not doc_path.lower().endswith('.pdf'):
+        return 0
+    
+    import pypdfium2 as pdfium
+    
+    try:
+        pdf = pdfium.PdfDocument(doc_path)
+    except Exception:
+        return 0
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def _split_pdf_pages(pdf_path, batch_size, temp_dir):
+    """
+    Split a PDF into consecutive slices of at most batch_size pages.
+    
+    The slices are written to a new directory inside temp_dir, so PDFs that
+    share a file name do not overwrite each other's slices.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        batch_size (int): Maximum number of pages per slice
+        temp_dir (str): Directory where the slice directory is created
+        
+    Returns:
+        list: List of (first_page, last_page, slice_path) tuples in page order,
+            with 1-based inclusive page numbers
+    """
+    import pypdfium2 as pdfium
+    
+    name_without_ext = os.path.splitext(os.path.basename(pdf_path))[0]
+    doc_dir = tempfile.mkdtemp(dir=temp_dir)
+    slices = []
+    
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        num_pages = len(pdf)
+        for start in range(0, num_pages, batch_size):
+            end = min(start + batch_size, num_pages)
+            slice_path = os.path.join(
+                doc_dir, f"{name_without_ext}_p{start + 1:05d}-{end:05d}.pdf"
+            )
+            
+            part = pdfium.PdfDocument.new()
+            try:
+                part.import_pages(pdf, list(range(start, end)))
+                part.save(slice_path)
+            finally:
+                part.close()
+            
+            slices.append((start + 1, end, slice_path))
+    finally:
+        pdf.close()
+    
+    return slices
+
+def _write_page_batches_markdown(batch_results, md_path):
+    """
+    Concatenate the Markdown files of a document's page batches.
+    
+    Args:
+        batch_results (list): List of (first_page, last_page, result) tuples in
+            page order, whose results were written to disk
+        md_path (str): Destination path
+    """
+    with open(md_path, 'wb') as out:
+        for i, (_, _, result) in enumerate(batch_results):
+            if i:
+                out.write(b"\n\n")
+            with open(result['markdown_path'], 'rb') as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+
+def _write_page_batches_json(doc_path, batch_results, json_path, pretty=False):
+    """
+    Write the merged JSON of a document's page batches from their JSON files.
+    
+    Each batch document is copied into place from its file without being
+    parsed, so only one batch is held in memory at a time. The output is the
+    same as _write_json of the merged dict.
+    
+    Args:
+        doc_path (str): Path to the original document
+        batch_results (list): List of (first_page, last_page, result) tuples in
+            page order, whose results were written with the same pretty setting
+        json_path (str): Destination path
+        pretty (bool): Write indented instead of compact JSON
+    """
+    nl, ind, colon = (b"\n", b"  ", b": ") if pretty else (b"", b"", b":")
+    
+    with open(json_path, 'wb') as out:
+        out.write(b"{" + nl + ind + b'"source"' + colon + orjson.dumps(doc_path) + b","
+                  + nl + ind + b'"page_batches"' + colon + b"[" + nl)
+        for i, (first, last, result) in enumerate(batch_results):
+            with open(result['json_path'], 'rb') as f:
+                document = f.read().rstrip(b"\n")
+            if pretty:
+                # Indent the batch document to its depth in the merged document
+                document = document.replace(b"\n", b"\n" + ind * 3)
+            out.write(ind * 2 + b"{" + nl
+                      + ind * 3 + b'"first_page"' + colon + b"%d," % first + nl
+                      + ind * 3 + b'"last_page"' + colon + b"%d," % last + nl
+                      + ind * 3 + b'"document"' + colon + document + nl
+                      + ind * 2 + b"}" + (b"," if i < len(batch_results) - 1 else b"") + nl)
+        out.write(ind + b"]" + nl + b"}\n")
+
+def _merge_page_batches(doc_path, batch_results, output_dir=None, pretty=False):
+    """
+    Stitch the results of a document's page batches back together.
+    
+    Args:
+        doc_path (str): Path to the original document
+        batch_results (list): List of (first_page, last_page, result) tuples
+        output_dir (str, optional): Directory to write the merged exports to,
+            from the batch files the workers wrote. When omitted, the batch
+            results hold their exports and the merged exports are returned.
+        pretty (bool): Write indented instead of compact JSON
+        
+    Returns:
+        dict: Parsing result for the whole document
+    """
+    batch_results = sorted(batch_results, key=lambda item: item[0])
+    
+    errors = [
+        f"pages {first}-{last}: {result['error']}"
+        for first, last, result in batch_results
+        if not result['success']
+    ]
+    if errors:
+        return {
+            'source': doc_path,
+            'error': "; ".join(errors),
+            'success': False
+        }
+    
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        md_path, json_path = _output_paths(doc_path, output_dir)
+        _write_page_batches_markdown(batch_results, md_path)
+        _write_page_batches_json(doc_path, batch_results, json_path, pretty)
+        return {
+            'source': doc_path,
+            'markdown_path': md_path,
+            'json_path': json_path,
+            'size': os.path.getsize(md_path) + os.path.getsize(json_path),
+            'success': True
+        }
+    
+    return {
+        'source': doc_path,
+        'markdown': "\n\n".join(result['markdown'] for _, _, result in batch_results),
+        'json': {
+            'source': doc_path,
+            'page_batches': [
+                {'first_page': first, 'last_page': last, 'document': result['json']}
+                for first, last, result in batch_results
+            ]
+        },
+        'success': True
+    }
+
+def parse_multiple_documents_page_batched(doc_paths, batch_size=16, page_threshold=None,
+                                          max_workers=None, page_counts=None,
+                                          output_dir=None, pretty=False):
+    """
+    Parse multiple documents concurrently, splitting large PDFs into page batches.
+    
+    PDFs with more than page_threshold pages are split into slices of batch_size
+    pages and every slice is submitted to the same process pool as the other
+    documents, so a single long PDF no longer keeps one worker busy while the
+    others idle. Slices are submitted as soon as their document is split, and
+    their results are stitched back together in page order.
+    
+    Args:
+        doc_paths (list): List of document paths
+        batch_size (int): Number of pages per batch
+        page_threshold (int, optional): Page count above which a PDF is split.
+            Defaults to batch_size.
+        max_workers (int, optional): Maximum number of worker processes.
+            Defaults to the number of CPUs, capped by the number of tasks.
+        page_counts (list, optional): Page count of each document, as returned
+            by _count_pdf_pages. Counted here when omitted.
+        output_dir (str, optional): Directory to save results to. Workers write
+            whole documents and page batches to disk, and batches are merged
+            from those files, so only result paths come back to this process.
+        pretty (bool): Write indented instead of compact JSON
+        
+    Returns:
+        list: List of parsed documents, in the order of doc_paths
+    """
+    if page_threshold is None:
+        page_threshold = batch_size
+    
+    results = []
+    
+    if not doc_paths:
+        return results
+    
+    if page_counts is None:
+        page_counts = [_count_pdf_pages(path) for path in doc_paths]
+    split = [pages > page_threshold for pages in page_counts]
+    
+    if max_workers is None:
+        num_tasks = sum(
+            math.ceil(pages / batch_size) if is_split else 1
+            for pages, is_split in zip(page_counts, split)
+        )
+        max_workers = min(num_tasks, os.cpu_count() or 1)
+    
+    # Batch results per document, indexed like doc_paths so a path given twice
+    # is parsed and merged twice
+    batches = [[] for _ in doc_paths]
+    temp_dir = tempfile.mkdtemp(prefix="docling_page_batches_")
+    
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(batch_size, max_workers),
+        ) as executor:
+            future_to_task = {}
+            for index, path in enumerate(doc_paths):
+                if not split[index]:
+                    future = executor.submit(_worker_parse, path, output_dir, pretty)
+                    future_to_task[future] = (index, None, None)
+                    continue
+                
+                try:
+                    slices = _split_pdf_pages(path, batch_size, temp_dir)
+                except Exception as e:
+                    batches[index].append((None, None, {
+                        'source': path,
+                        'error': str(e),
+                        'success': False
+                    }))
+                    continue
+                # Batch exports go next to their slices until they are merged;
+                # batch documents are named after the original file
+                batch_dir = os.path.dirname(slices[0][2]) if output_dir is not None else None
+                source_name = os.path.basename(path)
+                for first, last, slice_path in slices:
+                    future = executor.submit(
+                        _worker_parse, slice_path, batch_dir, pretty, source_name
+                    )
+                    future_to_task[future] = (index, first, last)
+            
+            for future in as_completed(future_to_task):
+                index, first, last = future_to_task[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {
+                        'source': doc_paths[index],
+                        'error': str(e),
+                        'success': False
+                    }
+                batches[index].append((first, last, result))
+        
+        for path, doc_batches in zip(doc_paths, batches):
+            first, _, result = doc_batches[0]
+            if first is not None:
+                result = _merge_page_batches(path, doc_batches, output_dir, pretty)
+            results.append(result)
+            if result['success']:
+                print(f"Successfully parsed: {path}")
+            else:
+                print(f"Error parsing {path}: {result['error']}")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    return results
+
+def parse_document_by_page_batches(doc_path, batch_size=16, max_workers=None,
+                                   output_dir=None, pretty=False):
+    """
+    Parse a single large PDF by splitting it into page batches.
+    
+    Args:
+        doc_path (str): Path to the PDF file
+        batch_size (int): Number of pages per batch
+        max_workers (int, optional): Maximum number of worker processes
+        output_dir (str, optional): Directory to save results to
+        pretty (bool): Write indented instead of compact JSON
+        
+    Returns:
+        dict: Parsing result for the whole document
+    """
+    return parse_multiple_documents_page_batched(
+        [doc_path], batch_size, page_threshold=batch_size, max_workers=max_workers,
+        output_dir=output_dir, pretty=pretty
+    )[0]
+
+def save_results(results, output_dir="output", pretty=False):
     """
     Save parsing results to files.
     
+    Results that were already written to disk while parsing are skipped.
+    
     Args:
         results (list): List of parsing results
         output_dir (str): Directory to save results
+        pretty (bool): Write indented instead of compact JSON
     """
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    for i, result in enumerate(results):
-        if not result['success']:
+    for result in results:
+        if not result['success'] or 'markdown' not in result:
             continue
-            
-        base_name = os.path.basename(result['source'])
-        name_without_ext = os.path.splitext(base_name)[0]
+        
+        md_path, json_path = _output_paths(result['source'], output_dir)
         
         # Save Markdown
-        md_path = os.path.join(output_dir, f"{name_without_ext}.md")
-        with open(md_path, 'w', encoding='utf-8') as f:
-            f.write(result['markdown'])
+        _write_markdown(result['markdown'], md_path)
         
         # Save JSON
-        json_path = os.path.join(output_dir, f"{name_without_ext}.json")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            import json
-            json.dump(result['json'], f, indent=2, ensure_ascii=False)
+        _write_json(result['json'], json_path, pretty)
         
         print(f"Saved results for {result['source']}")
 
@@ -164,7 +709,17 @@ def main():
     parser.add_argument("-o", "--output-dir", default="output", help="Output directory")
     parser.add_argument("--pdf-options", action="store_true", help="Use advanced PDF options")
     parser.add_argument("--concurrent", action="store_true", help="Use concurrent parsing")
-    parser.add_argument("--max-workers", type=int, default=4, help="Maximum number of concurrent workers")
+    parser.add_argument("--batch", action="store_true",
+                        help="Parse all documents as one batch with a shared converter")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Maximum number of concurrent worker processes (default: CPU count)")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Write indented JSON instead of compact JSON")
+    parser.add_argument("--page-batch-size", type=int, default=16,
+                        help="Pages per batch when splitting large PDFs (default: 16)")
+    parser.add_argument("--page-threshold", type=int, default=64,
+                        help="With --concurrent, split PDFs with more pages than this "
+                             "into page batches (default: 64)")
     
     args = parser.parse_args()
     
@@ -183,18 +738,16 @@ def main():
             markdown, json_data = parse_pdf_with_options(pdf_path)
             
             # Save results
-            base_name = os.path.splitext(os.path.basename(pdf_path))[0]
-            md_path = os.path.join(args.output_dir, f"{base_name}_advanced.md")
-            json_path = os.path.join(args.output_dir, f"{base_name}_advanced.json")
+            md_path, json_path = _output_paths(pdf_path, args.output_dir, "_advanced")
             
             os.makedirs(args.output_dir, exist_ok=True)
             
-            with open(md_path, 'w', encoding='utf-8') as f:
-                f.write(markdown)
+            # Free each export as soon as it is on disk
+            _write_markdown(markdown, md_path)
+            del markdown
             
-            with open(json_path, 'w', encoding='utf-8') as f:
-                import json
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
+            _write_json(json_data, json_path, args.pretty)
+            del json_data
             
             print(f"Saved advanced parsing results to {args.output_dir}")
         except Exception as e:
@@ -206,17 +759,43 @@ def main():
         
         start_time = time.time()
         
-        if args.concurrent:
-            print(f"Using concurrent parsing with {args.max_workers} workers...")
-            results = parse_multiple_documents_concurrent(args.documents, args.max_workers)
+        # Count pages once; the page-batch scheduler reuses the counts
+        page_counts = (
+            [_count_pdf_pages(path) for path in args.documents] if args.concurrent else []
+        )
+        
+        if any(pages > args.page_threshold for pages in page_counts):
+            print(f"Using page-batch parsing with {args.page_batch_size} pages per batch...")
+            results = parse_multiple_documents_page_batched(
+                args.documents,
+                args.page_batch_size,
+                args.page_threshold,
+                args.max_workers,
+                page_counts,
+                args.output_dir,
+                args.pretty
+            )
+        elif args.concurrent:
+            workers = args.max_workers or min(len(args.documents), os.cpu_count() or 1)
+            print(f"Using concurrent parsing with {workers} worker processes...")
+            results = parse_multiple_documents_concurrent(
+                args.documents, args.max_workers, args.output_dir, args.pretty
+            )
+        elif args.batch:
+            print("Using batch parsing with a shared converter...")
+            results = parse_multiple_documents_batch(
+                args.documents, args.output_dir, args.pretty
+            )
         else:
             print("Using sequential parsing...")
-            results = parse_multiple_documents_sequential(args.documents)
+            results = parse_multiple_documents_sequential(
+                args.documents, args.output_dir, args.pretty
+            )
         
         end_time = time.time()
         elapsed_time = end_time - start_time
         
-        save_results(results, args.output_dir)
+        save_results(results, args.output_dir, args.pretty)
         print(f"Saved all results to {args.output_dir}")
         print(f"Parsing completed in {elapsed_time:.2f} seconds")
 
@@ -0,0 +1,36 @@
+"""
+Docling converter factory shared by advanced_parsing.py and the full API server.
+"""
+
+import os
+from functools import lru_cache
+
+from docling.document_converter import DocumentConverter
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.pipeline_options import AcceleratorOptions, PdfPipelineOptions
+from docling.datamodel.format_option import PdfFormatOption
+
+
+@lru_cache(maxsize=8)
+def get_converter(do_ocr: bool = True, do_table_structure: bool = True,
+                  num_workers: int = 1) -> DocumentConverter:
+    """Return a DocumentConverter cached per PDF pipeline options.
+
+    Converters are cached so Docling's models are loaded once per process
+    instead of once per document. num_workers is the number of parsing
+    processes sharing the CPU.
+    """
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_ocr = do_ocr
+    pipeline_options.do_table_structure = do_table_structure
+    # The default device is AUTO (CUDA, then MPS, then CPU) and DOCLING_DEVICE
+    # overrides it
+    accelerator_options = AcceleratorOptions()
+    # Share all but one core between the parsing processes, unless
+    # OMP_NUM_THREADS or DOCLING_NUM_THREADS sets the thread count
+    if not (os.getenv("OMP_NUM_THREADS") or os.getenv("DOCLING_NUM_THREADS")):
+        accelerator_options.num_threads = max(1, ((os.cpu_count() or 2) - 1) // num_workers)
+    pipeline_options.accelerator_options = accelerator_options
+
+    pdf_format_option = PdfFormatOption(pipeline_options=pipeline_options)
+    return DocumentConverter(format_options={InputFormat.PDF: pdf_format_option})
@@ -4,16 +4,27 @@ Example client to test Docling Parser API
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import msgpack
 from pathlib import Path
 
 API_BASE_URL = "http://localhost:8000"
 
+# (connect, read) timeouts in seconds; parsing endpoints get a longer read timeout
+TIMEOUT = (3.05, 60)
+PARSE_TIMEOUT = (3.05, 300)
+
+# Shared session so every test reuses the same keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 def test_health():
     """Test health check endpoint."""
     print("🔍 Testing health check...")
     try:
-        response = requests.get(f"{API_BASE_URL}/health")
+        response = SESSION.get(f"{API_BASE_URL}/health", timeout=TIMEOUT)
         response.raise_for_status()
         print("✅ Health check passed:", response.json())
         return True
@@ -38,7 +49,7 @@ def test_file_upload(file_path: str):
                 'enable_table_structure': True
             }
             
-            response = requests.post(f"{API_BASE_URL}/upload", files=files, data=data)
+            response = SESSION.post(f"{API_BASE_URL}/upload", files=files, data=data, timeout=PARSE_TIMEOUT)
             response.raise_for_status()
             
             result = response.json()
@@ -54,25 +65,32 @@ def test_file_upload(file_path: str):
         return False
 
 def test_url_parsing():
-    """Test URL parsing endpoint."""
+    """Test URL parsing endpoint with MessagePack output."""
     print("🌐 Testing URL parsing...")
     
     url_data = {
         "url": "https://arxiv.org/pdf/2408.09869",
-        "format": "markdown",
+        "format": "msgpack",
         "enable_ocr": False,
         "enable_table_structure": True
     }
     
     try:
-        response = requests.post(f"{API_BASE_URL}/parse-url", json=url_data)
+        response = SESSION.post(f"{API_BASE_URL}/parse-url", json=url_data, timeout=PARSE_TIMEOUT)
         response.raise_for_status()
         
-        result = response.json()
         print("✅ URL parsing successful!")
-        print(f"   Format: {result['format']}")
-        print(f"   Content length: {len(result['content'])} characters")
-        print(f"   Preview: {result['content'][:200]}...")
+        if response.headers.get("content-type", "").startswith("application/msgpack"):
+            document = msgpack.unpackb(response.content)
+            print("   Format: msgpack")
+            print(f"   Payload size: {len(response.content)} bytes")
+            print(f"   Top-level keys: {list(document.keys())[:10]}")
+        else:
+            # Servers without MessagePack support fall back to a JSON ParseResponse
+            result = response.json()
+            print(f"   Format: {result['format']}")
+            print(f"   Content length: {len(result['content'])} characters")
+            print(f"   Preview: {result['content'][:200]}...")
         
         return True
         
@@ -85,7 +103,7 @@ def test_supported_formats():
     print("📋 Testing supported formats...")
     
     try:
-        response = requests.get(f"{API_BASE_URL}/supported-formats")
+        response = SESSION.get(f"{API_BASE_URL}/supported-formats", timeout=TIMEOUT)
         response.raise_for_status()
         
         result = response.json()
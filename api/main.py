@@ -1,25 +1,44 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
 import os
 import tempfile
-import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple, Union
+from urllib.parse import unquote, urlparse
 import mimetypes
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+import aiofiles
+import httpx
+from anyio import to_thread
+from fastapi import (
+    FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks, Request, Response
+)
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, HttpUrl
+import msgpack
 import uvicorn
 
-from docling.document_converter import DocumentConverter
 from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.datamodel.format_option import PdfFormatOption
+
+try:
+    from api.converters import get_converter
+    from api.uploads import restore_document_name, spool_upload, upload_name
+except ModuleNotFoundError:
+    # Run as a script from inside api/
+    from converters import get_converter
+    from uploads import restore_document_name, spool_upload, upload_name
 
 # Models
 class URLParseRequest(BaseModel):
     url: HttpUrl
-    format: str = "markdown"  # markdown, json, html
+    format: str = "markdown"  # markdown, json, html, msgpack
     enable_ocr: bool = False
     enable_table_structure: bool = True
 
@@ -27,7 +46,7 @@ class ParseResponse(BaseModel):
     success: bool
     message: str
     format: str
-    content: str
+    content: Union[str, dict]
     metadata: Optional[dict] = None
 
 class ErrorResponse(BaseModel):
@@ -41,7 +60,8 @@ app = FastAPI(
     description="Document parsing API using Docling library. Supports PDF, DOCX, PPTX, images and more.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -53,8 +73,79 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global converter instance
-converter = DocumentConverter()
+# Compress large Markdown/JSON responses; level 5 trades little CPU for most of the size gain
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Maximum number of documents parsed at the same time; bounds memory and open files
+MAX_CONCURRENT_PARSES = int(os.getenv("MAX_CONCURRENT_PARSES", "2"))
+PARSE_SEM = asyncio.Semaphore(MAX_CONCURRENT_PARSES)
+# Worker processes in the parsing pool
+PARSE_WORKERS = min(os.cpu_count() or 1, MAX_CONCURRENT_PARSES)
+
+def _init_worker() -> None:
+    """Load the default PDF pipeline models in a parsing worker process."""
+    # Same positional arguments as convert_document so the cache key matches
+    get_converter(False, True, PARSE_WORKERS).initialize_pipeline(InputFormat.PDF)
+
+def _create_parsing_pool() -> ProcessPoolExecutor:
+    """Create the process pool that runs document parsing off the event loop."""
+    return ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+def _worker_pid() -> int:
+    """Warm-up task: return the pid of the worker it ran on."""
+    # Keep the worker busy briefly so the other warm-up tasks go to other workers
+    time.sleep(0.05)
+    return os.getpid()
+
+async def _warm_parsing_pool(pool: ProcessPoolExecutor) -> None:
+    """Wait until every worker of the pool is started and has loaded the models.
+
+    ProcessPoolExecutor only starts workers when tasks are submitted, and a
+    worker runs _init_worker before its first task, so a warm-up task that
+    returns proves its worker is ready.
+    """
+    loop = asyncio.get_running_loop()
+    ready = set()
+    while len(ready) < PARSE_WORKERS:
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(pool, _worker_pid)
+            for _ in range(PARSE_WORKERS - len(ready))
+        ))
+        ready.update(pids)
+
+def _mark_pool_broken(pool: ProcessPoolExecutor) -> None:
+    """Report the parsing pool as broken on /health until it is replaced."""
+    # A request that ran on an already replaced pool says nothing about the current one
+    if app.state.pool is pool:
+        app.state.pool_broken = True
+
+async def _replace_parsing_pool(broken_pool: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """Replace a broken parsing pool with a new, warmed one and return the current pool."""
+    # Requests that failed on the same broken pool replace it only once
+    if app.state.pool is broken_pool:
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        app.state.pool = _create_parsing_pool()
+        app.state.pool_restarts += 1
+        await _warm_parsing_pool(app.state.pool)
+        app.state.pool_broken = False
+    return app.state.pool
+
+@app.on_event("startup")
+async def start_parsing_pool():
+    """Create the parsing process pool and load the models in every worker."""
+    app.state.pool = _create_parsing_pool()
+    app.state.pool_restarts = 0
+    app.state.pool_broken = False
+    await _warm_parsing_pool(app.state.pool)
+
+@app.on_event("shutdown")
+async def stop_parsing_pool():
+    """Shut down the parsing process pool."""
+    app.state.pool.shutdown(wait=False, cancel_futures=True)
 
 # Supported formats mapping
 SUPPORTED_FORMATS = {
@@ -70,66 +161,272 @@ SUPPORTED_FORMATS = {
     '.tif': InputFormat.IMAGE,
 }
 
+# Supported output formats
+OUTPUT_FORMATS = ["markdown", "json", "html", "msgpack"]
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+JSON_MEDIA_TYPE = "application/json"
+
+# On-disk cache of /parse-url responses, keyed by URL and parse options and revalidated
+# against the upstream ETag or Last-Modified, keeping the URL_CACHE_MAX_ENTRIES most recently used responses
+URL_CACHE_DIR = os.getenv("URL_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "docling-parser",
+    "url",
+)
+URL_CACHE_MAX_ENTRIES = int(os.getenv("URL_CACHE_MAX_ENTRIES", "256"))
+
+logger = logging.getLogger(__name__)
+
 def get_file_format(filename: str) -> Optional[InputFormat]:
     """Get input format from filename extension."""
-    ext = Path(filename).suffix.lower()
-    return SUPPORTED_FORMATS.get(ext)
+    # Slice from the last dot rather than building a Path on every upload
+    i = filename.rfind(".")
+    if i < 0:
+        return None
+    return SUPPORTED_FORMATS.get(filename[i:].lower())
 
-def parse_document_content(file_path: str, format_type: str = "markdown", 
-                          enable_ocr: bool = False, 
-                          enable_table_structure: bool = True) -> ParseResponse:
-    """Parse document and return specified format."""
-    try:
-        # Configure pipeline options for PDFs
-        if file_path.lower().endswith('.pdf'):
-            pipeline_options = PdfPipelineOptions()
-            pipeline_options.do_ocr = enable_ocr
-            pipeline_options.do_table_structure = enable_table_structure
-            
-            pdf_format_option = PdfFormatOption(pipeline_options=pipeline_options)
-            local_converter = DocumentConverter(format_options={InputFormat.PDF: pdf_format_option})
-        else:
-            local_converter = converter
-        
-        # Convert document
-        result = local_converter.convert(file_path)
-        
-        # Export to requested format
-        if format_type.lower() == "markdown":
-            content = result.document.export_to_markdown()
-        elif format_type.lower() == "json":
-            content = result.document.export_to_dict()
-        elif format_type.lower() == "html":
-            # If HTML export is available
-            try:
-                content = result.document.export_to_html()
-            except AttributeError:
-                content = result.document.export_to_markdown()
-                format_type = "markdown"  # Fallback
-        else:
+def convert_document(file_path: str, format_type: str = "markdown",
+                     enable_ocr: bool = False,
+                     enable_table_structure: bool = True,
+                     source_name: Optional[str] = None) -> Tuple[str, Any, dict]:
+    """Convert a document and export it to the specified format.
+
+    Runs in the parsing worker processes, so it only returns picklable values:
+    the effective format, the exported content and the document metadata.
+    source_name is the original file name of a document saved to a temp file.
+    """
+    # Pipeline options only affect PDFs; other formats share the same converter
+    local_converter = get_converter(enable_ocr, enable_table_structure, PARSE_WORKERS)
+    
+    # Convert document
+    result = local_converter.convert(file_path)
+    if source_name:
+        restore_document_name(result.document, source_name)
+    
+    # Export to requested format
+    if format_type.lower() == "markdown":
+        content = result.document.export_to_markdown()
+    elif format_type.lower() == "json":
+        content = result.document.export_to_dict()
+    elif format_type.lower() == "msgpack":
+        content = msgpack.packb(result.document.export_to_dict(), use_bin_type=True)
+        format_type = "msgpack"
+    elif format_type.lower() == "html":
+        # If HTML export is available
+        try:
+            content = result.document.export_to_html()
+        except AttributeError:
             content = result.document.export_to_markdown()
-            format_type = "markdown"
-        
-        # Get metadata
-        metadata = {
-            "num_pages": getattr(result.document, 'num_pages', None),
-            "title": getattr(result.document, 'title', None),
-            "file_size": os.path.getsize(file_path) if os.path.exists(file_path) else None,
-        }
-        
-        return ParseResponse(
-            success=True,
-            message="Document parsed successfully",
-            format=format_type,
-            content=content if isinstance(content, str) else str(content),
-            metadata=metadata
-        )
+            format_type = "markdown"  # Fallback
+    else:
+        content = result.document.export_to_markdown()
+        format_type = "markdown"
+    
+    # Get metadata
+    num_pages = getattr(result.document, 'num_pages', None)
+    metadata = {
+        "num_pages": num_pages() if callable(num_pages) else num_pages,
+        "title": getattr(result.document, 'title', None),
+        "file_size": os.path.getsize(file_path) if os.path.exists(file_path) else None,
+    }
+    
+    return format_type, content, metadata
+
+def build_parse_response(format_type: str, content: Any,
+                         metadata: dict) -> Union[ParseResponse, Response]:
+    """Build the HTTP response for converted document content.
+
+    The msgpack format returns the exported document dict as raw MessagePack
+    bytes instead of a ParseResponse.
+    """
+    if format_type == "msgpack":
+        return Response(content=content, media_type=MSGPACK_MEDIA_TYPE)
+    
+    return ParseResponse(
+        success=True,
+        message="Document parsed successfully",
+        format=format_type,
+        content=content,
+        metadata=metadata
+    )
+
+async def run_conversion(file_path: str, format_type: str, enable_ocr: bool,
+                         enable_table_structure: bool,
+                         source_name: Optional[str] = None) -> Tuple[str, Any, dict]:
+    """Run convert_document in the worker pool, at most MAX_CONCURRENT_PARSES at a time.
+
+    A pool broken by a dead worker (e.g. OOM-killed on a large PDF) is replaced,
+    so only the requests running on it fail.
+    """
+    args = (convert_document, file_path, format_type, enable_ocr, enable_table_structure,
+            source_name)
+    async with PARSE_SEM:
+        loop = asyncio.get_running_loop()
+        pool = app.state.pool
+        try:
+            future = loop.run_in_executor(pool, *args)
+        except BrokenProcessPool:
+            # The pool broke before this request was submitted; retry on a new one
+            _mark_pool_broken(pool)
+            pool = await _replace_parsing_pool(pool)
+            future = loop.run_in_executor(pool, *args)
         
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error parsing document: {str(e)}"
-        )
+        try:
+            return await future
+        except BrokenProcessPool:
+            _mark_pool_broken(pool)
+            await _replace_parsing_pool(pool)
+            raise
+
+def _download_suffix(url: str, content_type: Optional[str]) -> str:
+    """Pick a file extension for a downloaded document from its URL or content type."""
+    ext = Path(urlparse(url).path).suffix.lower()
+    if ext in SUPPORTED_FORMATS:
+        return ext
+    if content_type:
+        return mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
+    return ""
+
+def _response_validator(response: httpx.Response) -> Optional[Tuple[str, str]]:
+    """Return the (header, value) identifying this version of a remote document, if any."""
+    for header in ("etag", "last-modified"):
+        value = response.headers.get(header)
+        if value:
+            return header, value
+    return None
+
+async def _download_to_tmp(
+    url: str, validator: Optional[Tuple[str, str]] = None
+) -> Optional[Tuple[str, str, Optional[Tuple[str, str]]]]:
+    """Stream a remote document into a temporary file.
+
+    Returns the temporary file path, the document's file name taken from the URL
+    and the document's validator from _response_validator. With the validator of
+    a cached copy the request is conditional, and None is returned when the
+    document has not changed since.
+    """
+    headers = {}
+    if validator is not None:
+        header, value = validator
+        headers["if-none-match" if header == "etag" else "if-modified-since"] = value
+    
+    async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
+        async with client.stream("GET", url, headers=headers) as response:
+            if validator is not None and response.status_code == 304:
+                return None
+            response.raise_for_status()
+            
+            suffix = _download_suffix(str(response.url), response.headers.get("content-type"))
+            name = upload_name(unquote(urlparse(str(response.url)).path))
+            if not name.lower().endswith(suffix):
+                name += suffix
+            fd, temp_file_path = tempfile.mkstemp(suffix=suffix)
+            os.close(fd)
+            
+            try:
+                async with aiofiles.open(temp_file_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(1 << 16):
+                        await f.write(chunk)
+            except BaseException:
+                os.unlink(temp_file_path)
+                raise
+            
+            return temp_file_path, name, _response_validator(response)
+
+def _url_cache_key(url: str, request: URLParseRequest) -> str:
+    """Build the cache key for a URL and its parse options."""
+    parts = [
+        url,
+        request.format.lower(),
+        str(request.enable_ocr),
+        str(request.enable_table_structure),
+    ]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+def _url_etag(cache_key: str, validator: Tuple[str, str]) -> str:
+    """Build the ETag sent to clients for a cached URL version."""
+    return '"%s"' % hashlib.sha256("\0".join((cache_key, *validator)).encode()).hexdigest()
+
+def _url_cache_dir(create: bool = False) -> Optional[str]:
+    """Return URL_CACHE_DIR if only this user can write to it, else None.
+
+    Cached entries are served as responses, so a directory other users own or
+    can write to is refused rather than trusted.
+    """
+    if create:
+        os.makedirs(URL_CACHE_DIR, mode=0o700, exist_ok=True)
+    try:
+        st = os.stat(URL_CACHE_DIR)
+    except FileNotFoundError:
+        return None
+    if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+        logger.warning("Not using URL cache directory %s: other users can write to it",
+                       URL_CACHE_DIR)
+        return None
+    return URL_CACHE_DIR
+
+def _read_url_cache(cache_key: str) -> Optional[Tuple[Tuple[str, str], bytes]]:
+    """Return the validator and response body cached under cache_key, if any."""
+    cache_dir = _url_cache_dir()
+    if cache_dir is None:
+        return None
+    
+    path = os.path.join(cache_dir, cache_key)
+    try:
+        # Mark the entry as recently used for _prune_url_cache
+        os.utime(path)
+        with open(path, "rb") as f:
+            header = f.readline().decode("latin-1").rstrip("\n")
+            body = f.read()
+    except FileNotFoundError:
+        return None
+    
+    name, _, value = header.partition(": ")
+    return (name, value), body
+
+def _write_url_cache(cache_key: str, validator: Tuple[str, str], body: bytes) -> None:
+    """Store a response body and the upstream validator it was built from under cache_key.
+
+    Any previous entry is replaced atomically.
+    """
+    if URL_CACHE_MAX_ENTRIES <= 0:
+        return
+    cache_dir = _url_cache_dir(create=True)
+    if cache_dir is None:
+        return
+    
+    # Dot-prefixed so _prune_url_cache never counts or removes a file being written
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # Header values never contain a newline, so the first line holds the validator
+            f.write(("%s: %s\n" % validator).encode("latin-1"))
+            f.write(body)
+        os.replace(tmp_path, os.path.join(cache_dir, cache_key))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _prune_url_cache(cache_dir)
+
+def _prune_url_cache(cache_dir: str) -> None:
+    """Remove the least recently used entries beyond URL_CACHE_MAX_ENTRIES."""
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+    
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - URL_CACHE_MAX_ENTRIES)]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
 
 @app.get("/")
 async def root():
@@ -149,7 +446,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "Docling Parser API"}
+    pool_broken = app.state.pool_broken
+    return {
+        "status": "degraded" if pool_broken else "healthy",
+        "service": "Docling Parser API",
+        "max_concurrent_parses": MAX_CONCURRENT_PARSES,
+        "parsing_pool": {
+            "state": "broken" if pool_broken else "running",
+            "restarts": app.state.pool_restarts
+        }
+    }
 
 @app.post("/upload", response_model=ParseResponse)
 async def upload_file(
@@ -163,7 +469,7 @@ async def upload_file(
     Upload and parse a document file.
     
     - **file**: Document file to parse (PDF, DOCX, PPTX, images, etc.)
-    - **format**: Output format (markdown, json, html)
+    - **format**: Output format (markdown, json, html, msgpack)
     - **enable_ocr**: Enable OCR for image text extraction
     - **enable_table_structure**: Enable table structure detection
     """
@@ -176,59 +482,109 @@ async def upload_file(
             detail=f"Unsupported file format. Supported: {list(SUPPORTED_FORMATS.keys())}"
         )
     
-    # Create temporary file
-    temp_dir = tempfile.mkdtemp()
-    temp_file_path = os.path.join(temp_dir, file.filename)
+    # Create temporary file, keeping the extension for format detection
+    suffix = file.filename[file.filename.rfind("."):].lower()
+    fd, temp_file_path = tempfile.mkstemp(suffix=suffix)
     
     try:
-        # Save uploaded file
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save uploaded file without blocking the event loop
+        with os.fdopen(fd, "wb") as buffer:
+            await to_thread.run_sync(spool_upload, file.file, buffer)
         
-        # Parse document
-        result = parse_document_content(
+        # Parse document in the worker process pool
+        converted = await run_conversion(
             temp_file_path, 
             format, 
             enable_ocr, 
-            enable_table_structure
+            enable_table_structure,
+            upload_name(file.filename)
         )
+        result = build_parse_response(*converted)
         
         # Schedule cleanup
-        background_tasks.add_task(shutil.rmtree, temp_dir)
+        background_tasks.add_task(os.unlink, temp_file_path)
         
         return result
         
     except Exception as e:
         # Cleanup on error
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing file: {str(e)}"
         )
 
 @app.post("/parse-url", response_model=ParseResponse)
-async def parse_url(request: URLParseRequest):
+async def parse_url(request: URLParseRequest, http_request: Request,
+                    background_tasks: BackgroundTasks):
     """
     Parse document from URL.
     
+    Results are cached when the remote server sends an ETag or Last-Modified
+    header, and served again while a conditional GET reports the document
+    unchanged; responses carry an ETag so clients can send If-None-Match and
+    get a 304.
+    
     - **url**: URL to the document
-    - **format**: Output format (markdown, json, html)
+    - **format**: Output format (markdown, json, html, msgpack)
     - **enable_ocr**: Enable OCR for image text extraction
     - **enable_table_structure**: Enable table structure detection
     """
     
+    url = str(request.url)
+    temp_file_path = None
+    
     try:
-        # Parse document from URL
-        result = parse_document_content(
-            str(request.url),
+        cache_key = _url_cache_key(url, request)
+        cached = await to_thread.run_sync(_read_url_cache, cache_key)
+        if_none_match = http_request.headers.get("if-none-match", "")
+        client_etags = [tag.strip() for tag in if_none_match.split(",")]
+        
+        # Stream the document to disk instead of buffering it in memory, unless
+        # the cached copy is still current
+        downloaded = await _download_to_tmp(url, cached[0] if cached else None)
+        if downloaded is None:
+            validator, cached_body = cached
+            etag = _url_etag(cache_key, validator)
+            if etag in client_etags:
+                return Response(status_code=304, headers={"ETag": etag})
+            media_type = (
+                MSGPACK_MEDIA_TYPE if request.format.lower() == "msgpack" else JSON_MEDIA_TYPE
+            )
+            return Response(content=cached_body, media_type=media_type, headers={"ETag": etag})
+        
+        temp_file_path, source_name, validator = downloaded
+        etag = _url_etag(cache_key, validator) if validator else None
+        if etag is not None and etag in client_etags:
+            background_tasks.add_task(os.unlink, temp_file_path)
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        # Parse downloaded document in the worker process pool
+        converted = await run_conversion(
+            temp_file_path,
             request.format,
             request.enable_ocr,
-            request.enable_table_structure
+            request.enable_table_structure,
+            source_name
         )
+        result = build_parse_response(*converted)
+        
+        if etag is not None:
+            if not isinstance(result, Response):
+                result = ORJSONResponse(content=result.model_dump())
+            await to_thread.run_sync(_write_url_cache, cache_key, validator, result.body)
+            result.headers["ETag"] = etag
+        
+        # Schedule cleanup
+        background_tasks.add_task(os.unlink, temp_file_path)
         
         return result
         
     except Exception as e:
+        # Cleanup on error
+        if temp_file_path is not None and os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
         raise HTTPException(
             status_code=500,
             detail=f"Error parsing URL: {str(e)}"
@@ -240,7 +596,7 @@ async def get_supported_formats():
     return {
         "supported_formats": {
             "input": list(SUPPORTED_FORMATS.keys()),
-            "output": ["markdown", "json", "html"]
+            "output": OUTPUT_FORMATS
         },
         "format_details": {
             "pdf": "Portable Document Format - supports OCR and table detection",
@@ -6,18 +6,23 @@ Document parsing API without advanced PDF options (for troubleshooting)
 
 import os
 import tempfile
-import shutil
-from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, HttpUrl
 import uvicorn
 
 from docling.document_converter import DocumentConverter
 
+try:
+    from api.uploads import restore_document_name, spool_upload, upload_name
+except ModuleNotFoundError:
+    # Run as a script from inside api/
+    from uploads import restore_document_name, spool_upload, upload_name
+
 # Models
 class URLParseRequest(BaseModel):
     url: HttpUrl
@@ -27,7 +32,7 @@ class ParseResponse(BaseModel):
     success: bool
     message: str
     format: str
-    content: str
+    content: Union[str, dict]
     metadata: Optional[dict] = None
 
 # FastAPI app
@@ -36,7 +41,8 @@ app = FastAPI(
     description="Simplified document parsing API using Docling library.",
     version="1.0.0-simple",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -48,17 +54,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large Markdown/JSON responses; level 5 trades little CPU for most of the size gain
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Global converter instance
 converter = DocumentConverter()
 
 # Supported formats (simplified)
 SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.pptx', '.html', '.htm', '.png', '.jpg', '.jpeg', '.tiff']
+_SUPPORTED_EXTENSION_SET = frozenset(SUPPORTED_EXTENSIONS)
 
-def parse_document_content(file_path: str, format_type: str = "markdown") -> ParseResponse:
-    """Parse document and return specified format (simplified version)."""
+def parse_document_content(file_path: str, format_type: str = "markdown",
+                           source_name: Optional[str] = None) -> ParseResponse:
+    """Parse document and return specified format (simplified version).
+
+    source_name is the original file name of a document saved to a temp file.
+    """
     try:
         # Use basic converter without advanced options
         result = converter.convert(file_path)
+        if source_name:
+            restore_document_name(result.document, source_name)
         
         # Export to requested format
         if format_type.lower() == "markdown":
@@ -78,7 +94,7 @@ def parse_document_content(file_path: str, format_type: str = "markdown") -> Par
             success=True,
             message="Document parsed successfully",
             format=format_type,
-            content=content if isinstance(content, str) else str(content),
+            content=content,
             metadata=metadata
         )
         
@@ -122,33 +138,34 @@ async def upload_file(
     """
     
     # Validate file extension
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in SUPPORTED_EXTENSIONS:
+    i = file.filename.rfind(".")
+    file_ext = file.filename[i:].lower() if i >= 0 else ""
+    if file_ext not in _SUPPORTED_EXTENSION_SET:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported file format. Supported: {SUPPORTED_EXTENSIONS}"
         )
     
-    # Create temporary file
-    temp_dir = tempfile.mkdtemp()
-    temp_file_path = os.path.join(temp_dir, file.filename)
+    # Create temporary file, keeping the extension for format detection
+    fd, temp_file_path = tempfile.mkstemp(suffix=file_ext)
     
     try:
         # Save uploaded file
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        with os.fdopen(fd, "wb") as buffer:
+            spool_upload(file.file, buffer)
         
         # Parse document
-        result = parse_document_content(temp_file_path, format)
+        result = parse_document_content(temp_file_path, format, upload_name(file.filename))
         
         # Schedule cleanup
-        background_tasks.add_task(shutil.rmtree, temp_dir)
+        background_tasks.add_task(os.unlink, temp_file_path)
         
         return result
         
     except Exception as e:
         # Cleanup on error
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing file: {str(e)}"
@@ -0,0 +1,52 @@
+"""
+Upload helpers shared by the full and simplified API servers.
+"""
+
+import os
+import shutil
+
+
+def spool_upload(src, buffer) -> None:
+    """Copy an uploaded file object into the open binary file buffer.
+
+    Uploads already spilled to disk are copied by the kernel with os.sendfile;
+    in-memory uploads and platforms without sendfile use a buffered copy.
+    """
+    src.seek(0)
+    # Same check Starlette uses: fileno() would force an in-memory upload to disk
+    if getattr(src, "_rolled", True):
+        try:
+            size = os.fstat(src.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(buffer.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except (AttributeError, OSError, ValueError):
+            # Start over with the buffered copy
+            buffer.seek(0)
+            buffer.truncate()
+            src.seek(0)
+    shutil.copyfileobj(src, buffer, length=1024 * 1024)
+
+
+def upload_name(filename: str) -> str:
+    """Return the file name a client sent, without any directory part.
+
+    Names left empty or pointing at a directory (e.g. "C:\\" or "a/..") become "file".
+    """
+    name = filename.replace("\\", "/").rsplit("/", 1)[-1]
+    return "file" if name in ("", ".", "..") else name
+
+
+def restore_document_name(document, filename: str) -> None:
+    """Name a converted document after the original file instead of its temp file.
+
+    Docling names documents after the file they were read from, which for
+    uploads and downloads is a random mkstemp name.
+    """
+    document.name = os.path.splitext(filename)[0] or "file"
+    if document.origin is not None:
+        document.origin.filename = filename
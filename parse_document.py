@@ -42,7 +42,8 @@ def save_output(content, output_path):
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir, exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
+    # 1 MiB buffer so large Markdown outputs go out in a few large writes
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
         f.write(content)
     print(f"Document parsed and saved to {output_path}")
 
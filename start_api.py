@@ -6,11 +6,21 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 def main():
-    """Start the FastAPI server."""
+    """Start the FastAPI server.
+
+    Set DEV_RELOAD=1 for a single auto-reloading worker during development;
+    otherwise WEB_CONCURRENCY worker processes (default: 2) are started.
+    """
+    reload = bool(int(os.getenv("DEV_RELOAD", "0")))
+    # Reload mode only supports a single worker. Each worker loads its own copy of
+    # Docling's models, so keep the default small rather than one per core
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", "2"))
+    
     print("🚀 Starting Docling Parser API Server...")
     print("📖 API Documentation: http://localhost:8000/docs")
     print("🔄 Alternative Docs: http://localhost:8000/redoc") 
     print("⚡ API Endpoint: http://localhost:8000")
+    print("🔁 Auto-reload enabled" if reload else f"👷 Workers: {workers}")
     print("\n" + "="*50)
     
     try:
@@ -18,7 +28,11 @@ def main():
              "api.main_simple:app",
              host="0.0.0.0",
              port=8000,
-             reload=True,
+             workers=workers,
+             # uvloop is not available on Windows
+             loop="uvloop" if sys.platform != "win32" else "asyncio",
+             http="httptools",
+             reload=reload,
              log_level="info",
              access_log=True
          )
@@ -0,0 +1,26 @@
+"""
+Cached resolvers for the Docling components used by the tests.
+"""
+
+from functools import cache
+
+
+@cache
+def docling_converter():
+    """Return the DocumentConverter class, importing it on first use."""
+    from docling.document_converter import DocumentConverter
+    return DocumentConverter
+
+
+@cache
+def docling_input_format():
+    """Return the InputFormat enum, importing it on first use."""
+    from docling.datamodel.base_models import InputFormat
+    return InputFormat
+
+
+@cache
+def docling_pdf_pipeline_options():
+    """Return the PdfPipelineOptions class, importing it on first use."""
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    return PdfPipelineOptions
@@ -0,0 +1,268 @@
+"""
+Unit tests for the batch and page-batch parsing in advanced_parsing.
+"""
+
+from concurrent.futures import Future
+from pathlib import Path
+from types import SimpleNamespace
+
+import orjson
+import pypdfium2 as pdfium
+import pytest
+
+
+@pytest.fixture(scope="session")
+def ap_mod():
+    """Import advanced_parsing lazily, like the other test modules."""
+    import advanced_parsing
+    return advanced_parsing
+
+
+def make_pdf(path, num_pages, width):
+    """Write a PDF of blank pages whose width identifies where they came from."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(num_pages):
+        pdf.new_page(width, 300)
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
+
+
+def page_widths(path):
+    """Return the rounded width of every page of a PDF."""
+    pdf = pdfium.PdfDocument(str(path))
+    try:
+        return [round(page.get_width()) for page in pdf]
+    finally:
+        pdf.close()
+
+
+class FakeDocument:
+    """Stand-in for a DoclingDocument, exporting the page widths of its PDF."""
+
+    def __init__(self, path):
+        self.widths = page_widths(path)
+        self.name = Path(path).stem
+        self.origin = SimpleNamespace(filename=Path(path).name)
+
+    def export_to_markdown(self):
+        return f"{self.name}: {self.widths}"
+
+    def export_to_dict(self):
+        return {
+            "name": self.name,
+            "origin": {"filename": self.origin.filename},
+            "widths": self.widths,
+        }
+
+
+class FakeConverter:
+    """Stand-in for a DocumentConverter that reads PDFs with pypdfium2.
+
+    convert_all reports the files named in `failing` as failed conversions
+    and raises once it has yielded `stop_after` results.
+    """
+
+    def __init__(self):
+        self.failing = set()
+        self.stop_after = None
+        self.batch_sources = []
+
+    def convert(self, path):
+        return SimpleNamespace(document=FakeDocument(path))
+
+    def convert_all(self, sources, raises_on_error=True):
+        self.batch_sources = list(sources)
+        for count, source in enumerate(self.batch_sources):
+            if count == self.stop_after:
+                raise RuntimeError("batch stopped")
+            if source.name in self.failing:
+                yield SimpleNamespace(
+                    status="failure", input=SimpleNamespace(file=source), document=None,
+                    errors=[SimpleNamespace(error_message=f"cannot read {source.name}")],
+                )
+            else:
+                yield SimpleNamespace(
+                    status="success", input=SimpleNamespace(file=source),
+                    document=FakeDocument(source), errors=[],
+                )
+
+
+class InlineExecutor:
+    """Run submitted tasks in the test process instead of worker processes."""
+
+    def __init__(self, *args, **kwargs):
+        # The worker initializer is skipped; the converter is stubbed
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture
+def fake_converter(ap_mod, monkeypatch):
+    """Make advanced_parsing parse through FakeConverter in this process."""
+    converter = FakeConverter()
+    monkeypatch.setattr(ap_mod, "_get_converter", lambda *args: converter)
+    monkeypatch.setattr(ap_mod, "ProcessPoolExecutor", InlineExecutor)
+    return converter
+
+
+def test_split_pdf_pages_keeps_same_named_pdfs_apart(ap_mod, tmp_path):
+    """Test that PDFs sharing a file name are split into separate slices."""
+    first = make_pdf(tmp_path / "d1" / "report.pdf", 20, 111)
+    second = make_pdf(tmp_path / "d2" / "report.pdf", 30, 222)
+    temp_dir = tmp_path / "slices"
+    temp_dir.mkdir()
+
+    first_slices = ap_mod._split_pdf_pages(first, 8, str(temp_dir))
+    second_slices = ap_mod._split_pdf_pages(second, 8, str(temp_dir))
+
+    assert [(start, end) for start, end, _ in first_slices] == [(1, 8), (9, 16), (17, 20)]
+    assert [(start, end) for start, end, _ in second_slices] == [
+        (1, 8), (9, 16), (17, 24), (25, 30)
+    ]
+    for start, end, slice_path in first_slices:
+        assert page_widths(slice_path) == [111] * (end - start + 1)
+    for start, end, slice_path in second_slices:
+        assert page_widths(slice_path) == [222] * (end - start + 1)
+
+
+def test_merge_page_batches_orders_pages(ap_mod):
+    """Test that batch results are merged in page order."""
+    batches = [
+        (9, 16, {"success": True, "markdown": "second", "json": {"part": 2}}),
+        (1, 8, {"success": True, "markdown": "first", "json": {"part": 1}}),
+    ]
+
+    result = ap_mod._merge_page_batches("big.pdf", batches)
+
+    assert result["success"]
+    assert result["markdown"] == "first\n\nsecond"
+    assert result["json"]["page_batches"] == [
+        {"first_page": 1, "last_page": 8, "document": {"part": 1}},
+        {"first_page": 9, "last_page": 16, "document": {"part": 2}},
+    ]
+
+
+def test_merge_page_batches_reports_batch_errors(ap_mod):
+    """Test that a failed batch fails the document and names its pages."""
+    batches = [
+        (1, 8, {"success": True, "markdown": "first", "json": {}}),
+        (9, 16, {"success": False, "error": "boom"}),
+    ]
+
+    result = ap_mod._merge_page_batches("big.pdf", batches)
+
+    assert not result["success"]
+    assert result["error"] == "pages 9-16: boom"
+
+
+@pytest.mark.parametrize("pretty", [False, True], ids=["compact", "pretty"])
+def test_merge_page_batches_writes_from_batch_files(ap_mod, tmp_path, pretty):
+    """Test that merging on disk writes the same files as the in-memory merge."""
+    in_memory = []
+    on_disk = []
+    for first, last in ((9, 16), (1, 8)):
+        document = {"name": "big", "pages": list(range(first, last + 1)), "text": "é"}
+        markdown = f"pages {first}-{last}"
+        md_path, json_path = ap_mod._output_paths(f"big_p{first}.pdf", str(tmp_path))
+        ap_mod._write_markdown(markdown, md_path)
+        ap_mod._write_json(document, json_path, pretty)
+        in_memory.append((first, last, {"success": True, "markdown": markdown,
+                                        "json": document}))
+        on_disk.append((first, last, {"success": True, "markdown_path": md_path,
+                                      "json_path": json_path}))
+
+    expected = ap_mod._merge_page_batches("big.pdf", in_memory)
+    result = ap_mod._merge_page_batches("big.pdf", on_disk, str(tmp_path / "out"), pretty)
+
+    assert result["success"]
+    assert Path(result["markdown_path"]).read_text(encoding="utf-8") == expected["markdown"]
+    option = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_INDENT_2 if pretty else 0)
+    assert Path(result["json_path"]).read_bytes() == orjson.dumps(expected["json"], option=option)
+
+
+def test_page_batched_parsing_keeps_documents_apart(ap_mod, fake_converter, tmp_path):
+    """Test that same-named and repeated inputs are each merged from their own pages."""
+    first = make_pdf(tmp_path / "d1" / "report.pdf", 20, 111)
+    second = make_pdf(tmp_path / "d2" / "report.pdf", 30, 222)
+
+    results = ap_mod.parse_multiple_documents_page_batched(
+        [first, second, first], batch_size=8, page_threshold=4
+    )
+
+    widths = [
+        [width for batch in result["json"]["page_batches"]
+         for width in batch["document"]["widths"]]
+        for result in results
+    ]
+    assert widths == [[111] * 20, [222] * 30, [111] * 20]
+    for result in results:
+        for batch in result["json"]["page_batches"]:
+            assert batch["document"]["name"] == "report"
+            assert batch["document"]["origin"]["filename"] == "report.pdf"
+
+
+def test_batch_parsing_reports_missing_files(ap_mod, fake_converter, tmp_path):
+    """Test that a missing file is kept out of the batch and reported on its own."""
+    first = make_pdf(tmp_path / "first.pdf", 2, 111)
+    second = make_pdf(tmp_path / "second.pdf", 3, 222)
+    missing = str(tmp_path / "missing.pdf")
+
+    results = ap_mod.parse_multiple_documents_batch([first, missing, second])
+
+    assert fake_converter.batch_sources == [Path(first), Path(second)]
+    assert [result["success"] for result in results] == [True, False, True]
+    assert results[1]["source"] == missing
+    assert results[0]["json"]["widths"] == [111] * 2
+    assert results[2]["json"]["widths"] == [222] * 3
+
+
+def test_batch_parsing_keeps_duplicate_paths(ap_mod, fake_converter, tmp_path):
+    """Test that a path given twice gets a result at each of its positions."""
+    first = make_pdf(tmp_path / "first.pdf", 2, 111)
+    second = make_pdf(tmp_path / "second.pdf", 3, 222)
+
+    results = ap_mod.parse_multiple_documents_batch([first, second, first])
+
+    assert [result["source"] for result in results] == [first, second, first]
+    assert [result["json"]["widths"] for result in results] == [
+        [111] * 2, [222] * 3, [111] * 2
+    ]
+
+
+def test_batch_parsing_reports_failed_conversions(ap_mod, fake_converter, tmp_path):
+    """Test that a failed conversion reports Docling's errors without failing the batch."""
+    good = make_pdf(tmp_path / "good.pdf", 2, 111)
+    bad = make_pdf(tmp_path / "bad.pdf", 2, 222)
+    fake_converter.failing = {"bad.pdf"}
+
+    results = ap_mod.parse_multiple_documents_batch([bad, good])
+
+    assert not results[0]["success"]
+    assert results[0]["error"] == "cannot read bad.pdf"
+    assert results[1]["success"]
+
+
+def test_batch_parsing_finishes_after_the_batch_stops(ap_mod, fake_converter, tmp_path):
+    """Test that documents left over when convert_all raises are parsed one by one."""
+    paths = [make_pdf(tmp_path / f"doc{i}.pdf", 1, 100 + i) for i in range(3)]
+    fake_converter.stop_after = 1
+
+    results = ap_mod.parse_multiple_documents_batch(paths)
+
+    assert [result["json"]["widths"] for result in results] == [[100], [101], [102]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
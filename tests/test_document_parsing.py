@@ -3,15 +3,18 @@ Unit tests for document parsing functionality.
 """
 
 import pytest
-import os
 from unittest.mock import patch, MagicMock
 
-# Import the functions we want to test
-from parse_document import parse_document, save_output
+@pytest.fixture(scope="session")
+def parse_mod():
+    """Import parse_document lazily so collecting tests does not load Docling."""
+    import parse_document
+    return parse_document
 
 
-def test_parse_document():
-    """Test the parse_document function."""
+@pytest.mark.parametrize("name", ["parse_document", "save_output"])
+def test_callable(parse_mod, name):
+    """Test that the parsing functions are exposed."""
     # This is a placeholder test since we don't have actual documents to parse in tests
     # In a real scenario, you would either:
     # 1. Use mock objects to simulate the DocumentConverter
@@ -19,28 +22,22 @@ def test_parse_document():
     # 3. Use online documents that are guaranteed to be available
     
     # For now, we'll just test that the function signature is correct
-    assert callable(parse_document)
-    assert callable(save_output)
+    assert callable(getattr(parse_mod, name))
 
 
-def test_save_output():
+def test_save_output(parse_mod, tmp_path):
     """Test the save_output function."""
-    # Create a temporary file path
-    test_file = "test_output.txt"
+    # Create a temporary file path; pytest removes tmp_path afterwards
+    test_file = tmp_path / "test_output.txt"
     
     # Test content
     content = "# Test Document\n\nThis is a test."
     
     # Save the content
-    save_output(content, test_file)
+    parse_mod.save_output(content, test_file)
     
     # Check that the file was created and has the correct content
-    assert os.path.exists(test_file)
-    with open(test_file, 'r', encoding='utf-8') as f:
-        assert f.read() == content
-    
-    # Clean up
-    os.remove(test_file)
+    assert test_file.read_text(encoding='utf-8') == content
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+"""
+Tests for the setup verification checks.
+"""
+
+from functools import partial
+
+import pytest
+
+# Imported as a module so pytest does not collect verify_setup.test_docling_import itself
+import verify_setup
+from tests._docling_cache import (
+    docling_converter,
+    docling_input_format,
+    docling_pdf_pipeline_options,
+)
+
+
+@pytest.mark.parametrize(
+    "check",
+    [
+        verify_setup.check_python_version,
+        partial(verify_setup.check_package_installed, "docling"),
+        verify_setup.test_docling_import,
+    ],
+    ids=["python_version", "docling_installed", "docling_import"],
+)
+def test_setup_check(check):
+    """Test that each setup check passes."""
+    passed, report = check()
+    assert passed, report
+
+
+@pytest.mark.parametrize(
+    "resolve",
+    [docling_converter, docling_input_format, docling_pdf_pipeline_options],
+    ids=["DocumentConverter", "InputFormat", "PdfPipelineOptions"],
+)
+def test_docling_components(resolve):
+    """Test that the Docling components the parsers use can be imported."""
+    assert resolve() is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
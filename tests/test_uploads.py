@@ -0,0 +1,112 @@
+"""
+Unit tests for the upload helpers shared by the API servers.
+"""
+
+import os
+from tempfile import SpooledTemporaryFile, TemporaryFile
+from types import SimpleNamespace
+
+import pytest
+
+from api import uploads
+
+DATA = bytes(range(256)) * 64
+
+
+def make_upload(max_size):
+    """Return an upload holding DATA, spilled to disk when DATA exceeds max_size."""
+    src = SpooledTemporaryFile(max_size=max_size)
+    src.write(DATA)
+    return src
+
+
+@pytest.mark.parametrize(
+    "max_size, rolled",
+    [(1024, True), (len(DATA) * 2, False)],
+    ids=["on_disk", "in_memory"],
+)
+def test_spool_upload_copies_upload(monkeypatch, max_size, rolled):
+    """Test that uploads are copied with sendfile from disk and buffered from memory."""
+    sendfile_calls = []
+    real_sendfile = os.sendfile
+
+    def sendfile(*args):
+        sendfile_calls.append(args)
+        return real_sendfile(*args)
+
+    monkeypatch.setattr(os, "sendfile", sendfile)
+
+    with make_upload(max_size) as src, TemporaryFile() as buffer:
+        assert src._rolled is rolled
+        uploads.spool_upload(src, buffer)
+
+        buffer.seek(0)
+        assert buffer.read() == DATA
+        assert bool(sendfile_calls) is rolled
+        # An in-memory upload must not be forced to disk
+        assert src._rolled is rolled
+
+
+def test_spool_upload_restarts_after_failed_sendfile(monkeypatch):
+    """Test that a sendfile failing partway is replaced by a full buffered copy."""
+    real_sendfile = os.sendfile
+
+    def sendfile(out_fd, in_fd, offset, count):
+        if offset:
+            raise OSError("sendfile stopped")
+        return real_sendfile(out_fd, in_fd, offset, 100)
+
+    monkeypatch.setattr(os, "sendfile", sendfile)
+
+    with make_upload(1024) as src, TemporaryFile() as buffer:
+        uploads.spool_upload(src, buffer)
+
+        buffer.seek(0)
+        assert buffer.read() == DATA
+
+
+@pytest.mark.parametrize(
+    "filename, expected",
+    [
+        ("report.pdf", "report.pdf"),
+        ("a/b/report.pdf", "report.pdf"),
+        ("C:\\Users\\me\\report.pdf", "report.pdf"),
+        ("..\\..\\report.pdf", "report.pdf"),
+        ("..\\", "file"),
+        ("C:\\", "file"),
+        ("a/b/", "file"),
+        ("a/..", "file"),
+        ("", "file"),
+    ],
+)
+def test_upload_name(filename, expected):
+    """Test that client file names lose their directory part."""
+    assert uploads.upload_name(filename) == expected
+
+
+@pytest.mark.parametrize(
+    "filename, expected_name",
+    [("report.pdf", "report"), ("archive.tar.gz", "archive.tar"), (".pdf", ".pdf")],
+)
+def test_restore_document_name(filename, expected_name):
+    """Test that a document takes the name and origin of the original file."""
+    document = SimpleNamespace(name="tmpab12cd", origin=SimpleNamespace(filename="tmpab12cd.pdf"))
+
+    uploads.restore_document_name(document, filename)
+
+    assert document.name == expected_name
+    assert document.origin.filename == filename
+
+
+def test_restore_document_name_without_stem_or_origin():
+    """Test that a document without a stem or an origin is still named."""
+    document = SimpleNamespace(name="tmpab12cd", origin=None)
+
+    uploads.restore_document_name(document, "")
+
+    assert document.name == "file"
+    assert document.origin is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
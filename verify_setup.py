@@ -5,72 +5,118 @@ Script to verify that the Docling parser setup is working correctly.
 
 import sys
 import importlib.util
+from functools import cache, partial
 
 def check_python_version():
-    """Check if Python version is compatible."""
-    print("Checking Python version...")
+    """Check if Python version is compatible. Returns (passed, report)."""
+    lines = ["Checking Python version..."]
     version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 11):
-        print(f"ERROR: Python 3.11 or higher is required. Current version: {version.major}.{version.minor}")
-        return False
-    print(f"✓ Python version {version.major}.{version.minor}.{version.micro} is compatible")
-    return True
+    if version < (3, 11):
+        lines.append(f"ERROR: Python 3.11 or higher is required. Current version: {version.major}.{version.minor}")
+        return False, "\n".join(lines)
+    lines.append(f"✓ Python version {version.major}.{version.minor}.{version.micro} is compatible")
+    return True, "\n".join(lines)
 
-def check_package_installed(package_name):
-    """Check if a package is installed."""
-    print(f"Checking if {package_name} is installed...")
+@cache
+def _spec(name):
+    """Find the module spec for a name once per process; None if not found."""
     try:
-        spec = importlib.util.find_spec(package_name)
-        if spec is not None:
-            print(f"✓ {package_name} is installed")
-            return True
-        else:
-            print(f"✗ {package_name} is not installed")
-            return False
+        return importlib.util.find_spec(name)
     except ImportError:
-        print(f"✗ {package_name} is not installed")
+        return None
+
+def _is_package_installed(package_name):
+    """Check for a package through the cached spec and bind it lazily in sys.modules.
+
+    Found top-level packages are registered through importlib.util.LazyLoader,
+    so a later import reuses this lookup instead of searching sys.path again,
+    while the package code only runs when the module is first used.
+    """
+    # Already imported packages need no sys.path search
+    if package_name in sys.modules:
+        return True
+    spec = _spec(package_name)
+    if spec is None:
         return False
+    
+    if spec.loader is not None and "." not in package_name:
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[package_name] = module
+        loader.exec_module(module)
+    return True
+
+def check_package_installed(package_name):
+    """Check if a package is installed. Returns (passed, report)."""
+    lines = [f"Checking if {package_name} is installed..."]
+    if _is_package_installed(package_name):
+        lines.append(f"✓ {package_name} is installed")
+        return True, "\n".join(lines)
+    lines.append(f"✗ {package_name} is not installed")
+    return False, "\n".join(lines)
+
+_CHECK_DOCLING = partial(check_package_installed, "docling")
 
 def test_docling_import():
-    """Test importing Docling components."""
-    print("Testing Docling imports...")
+    """Test importing Docling components. Returns (passed, report)."""
+    lines = ["Testing Docling imports..."]
     try:
-        from docling.document_converter import DocumentConverter
-        from docling.datamodel.base_models import InputFormat
-        from docling.datamodel.pipeline_options import PdfPipelineOptions
-        print("✓ Docling components imported successfully")
-        return True
+        import docling.document_converter as document_converter
+        import docling.datamodel.base_models as base_models
+        import docling.datamodel.pipeline_options as pipeline_options
+        
+        # Look the components up on the imported modules, so a missing one is named
+        components = (
+            (document_converter, "DocumentConverter"),
+            (base_models, "InputFormat"),
+            (pipeline_options, "PdfPipelineOptions"),
+        )
+        missing = [
+            f"{module.__name__}.{name}"
+            for module, name in components
+            if getattr(module, name, None) is None
+        ]
+        if missing:
+            lines.append(f"✗ Missing Docling components: {', '.join(missing)}")
+            return False, "\n".join(lines)
+        lines.append("✓ Docling components imported successfully")
+        return True, "\n".join(lines)
     except ImportError as e:
-        print(f"✗ Failed to import Docling components: {e}")
-        return False
+        lines.append(f"✗ Failed to import Docling components: {e}")
+        return False, "\n".join(lines)
     except Exception as e:
-        print(f"✗ Error importing Docling components: {e}")
-        return False
+        lines.append(f"✗ Error importing Docling components: {e}")
+        return False, "\n".join(lines)
 
 def main():
     """Main verification function."""
-    print("Verifying Docling Parser setup...\n")
+    # Collect the whole report and write it to stdout in one call
+    lines = ["Verifying Docling Parser setup...", ""]
     
-    checks = [
-        check_python_version,
-        lambda: check_package_installed("docling"),
-        test_docling_import
-    ]
+    checks = (check_python_version, _CHECK_DOCLING, test_docling_import)
     
     all_passed = True
     for check in checks:
-        if not check():
+        passed, report = check()
+        if not passed:
             all_passed = False
-        print()  # Add spacing between checks
+        lines.append(report)
+        lines.append("")  # Add spacing between checks
     
     if all_passed:
-        print("✓ All checks passed! Your setup is ready to use.")
-        print("\nNext steps:")
-        print("1. Try parsing a document: python parse_document.py")
-        print("2. For advanced usage: python advanced_parsing.py")
-        print("3. Run tests: pytest")
+        lines.append("✓ All checks passed! Your setup is ready to use.")
+        lines.append("\nNext steps:")
+        lines.append("1. Try parsing a document: python parse_document.py")
+        lines.append("2. For advanced usage: python advanced_parsing.py")
+        lines.append("3. Run tests: pytest")
     else:
-        print("✗ Some checks failed. Please review the errors above.")
+        lines.append("✗ Some checks failed. Please review the errors above.")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+    
+    if not all_passed:
         sys.exit(1)
 
 if __name__ == "__main__":